@@ -6,10 +6,17 @@ Load HDF file from DeepLabCut and edit labels. Returns updated HDF file.
 
 import os
 import sys
+import collections
+import functools
+import queue
+import threading
+import time
 import scipy
 from scipy import io
 import argparse
+import av
 import cv2
+import h5py
 import pandas as pd
 import numpy as np
 
@@ -22,6 +29,83 @@ __author__ = "Jonathan Perdomo"
 __license__ = "GPL-3.0"
 __version__ = "0.1.0"
 
+FRAME_CACHE_BYTES = 512 * 1024 * 1024  # Memory budget for decoded frames
+MAX_DECODE_AHEAD = 30  # Forward steps (in frames) decoded sequentially instead of seeking
+DRAFT_LOWRES = 1  # Scrubbing decodes at 1/2**DRAFT_LOWRES resolution where the codec supports it
+DRAFT_SETTLE_TIME = 0.2  # Seconds after the last frame trackbar move before showing the full resolution frame
+IDLE_SLEEP = 0.005  # Seconds to sleep between event polls when there is nothing to redraw
+_VIDEO_EXTS = frozenset({'.avi', '.mp4'})
+_MARKER_COLORS = {  # BGR
+    'red': (0, 0, 255),
+    'green': (0, 255, 0),
+    'blue': (255, 0, 0)
+}
+
+
+# Process window events without blocking (cv2.pollKey requires OpenCV 4.5+)
+poll_key = getattr(cv2, 'pollKey', lambda: cv2.waitKey(1))
+
+
+class VideoReader(object):
+    def __init__(self, video_file, lowres=0):
+        """Opens the video for frame-accurate decoding"""
+        self.__video_file = video_file
+        self.__container = av.open(video_file)
+        self.__stream = self.__container.streams.video[0]
+        assert self.__stream.average_rate, "Video frame rate is unknown: {}".format(video_file)
+        if lowres:
+            # Reduced resolution decoding (e.g. MJPEG); ignored by codecs that do not support it
+            self.__stream.codec_context.options = {'lowres': str(lowres)}
+
+        self.__lock = threading.Lock()
+        self.__decoder = self.__container.decode(self.__stream)  # Positioned after the last decoded frame
+        self.__stream_pos = -1  # Index of the last decoded frame
+        self.__last_frame = None  # Last frame produced by the decoder
+        self.width = self.__stream.width
+        self.height = self.__stream.height
+
+    def count_frames(self):
+        """Get the number of frames in the video"""
+        frame_count = self.__stream.frames
+        if frame_count == 0:
+            # Not all containers store the frame count, so estimate it from the duration
+            assert self.__container.duration, "Video frame count is unknown: {}".format(self.__video_file)
+            frame_count = int(self.__container.duration / av.time_base * self.__stream.average_rate)
+
+        return frame_count
+
+    def _frame_pts(self, idx):
+        """Get the presentation timestamp of a frame index in stream time base units"""
+        start_time = self.__stream.start_time or 0
+        return start_time + int(round(idx / self.__stream.average_rate / self.__stream.time_base))
+
+    def grab(self, idx):
+        """Decode the frame at the given index as a BGR image"""
+        target_pts = self._frame_pts(idx)
+        with self.__lock:
+            # Seeking flushes the decoder, so only seek if the target is behind or far ahead
+            if not 0 < idx - self.__stream_pos <= MAX_DECODE_AHEAD:
+                self.__container.seek(target_pts, stream=self.__stream)
+                self.__decoder = self.__container.decode(self.__stream)
+                self.__last_frame = None
+
+            # Decode forward to the target frame, stopping at the end of the stream
+            for frame in self.__decoder:
+                self.__last_frame = frame
+                if frame.pts is None or frame.pts >= target_pts:
+                    break
+
+            # Past the end (e.g. the frame count was estimated from the duration) the last frame is used
+            frame = self.__last_frame
+            assert frame is not None, f"Could not decode frame {idx} of the video"
+            self.__stream_pos = idx
+
+        return frame.to_ndarray(format='bgr24')
+
+    def close(self):
+        """Close the video file"""
+        self.__container.close()
+
 
 class Editor(object):
     def __init__(self, label_file, video_file, marker_color, marker_size, marker_thickness):
@@ -35,10 +119,19 @@ class Editor(object):
         self.__text_x, self.__text_y = (20, 20)  # Label name position
         self.__mx, self.__my = 0, 0   # Current mouse position
         self.__mouse_pressed = False
+        self.__pending_edits = collections.deque()  # (frame, label, x, y) positions from the mouse observer
+        self.__flush_requested = False  # Whether the mouse button was released since the last poll
+        self.__dirty = True  # Whether the display needs to be redrawn
+        self.__show_draft = False  # Whether to show the reduced resolution frame while scrubbing
+        self.__last_scrub_time = 0.0
         self.__marker_size = marker_size
         self.__marker_thickness = marker_thickness
         self.__marker_color = marker_color
         self.__changes_made = False  # Whether labels were edited in the session
+        self.__dirty_cells = set()  # (frame, label) pairs waiting to be written to disk
+        self.__save_delay = 0.25  # Seconds to collect further edits before writing to disk
+        self.__save_lock = threading.Lock()  # Guards the label data and pending edits
+        self.__file_lock = threading.Lock()  # Serializes writes to the fixed label file
 
         # Set up the output filepath for fixed labels
         input_filename = os.path.splitext(os.path.basename(os.path.normpath(self.__label_file)))[0].rsplit('_Fixed')[0]
@@ -46,14 +139,56 @@ class Editor(object):
         output_filename = "%s_Fixed.h5" % input_filename
         self.__fixed_label_file = os.path.normpath(os.path.join(folder, output_filename))
 
-        # Load labels
-        self.__label_data = pd.read_hdf(label_file)
-        self.__data_name = self.__label_data.keys()[0][0]
-        self.__label_names = np.unique([k[1] for k in self.__label_data.keys()])
+        # Label name -> (x, y) column indices in a row of the fixed label table, set after the first full write
+        self.__h5_columns = None
 
-        # Load video
-        self.__cap = cv2.VideoCapture(self.__video_file)
-        self.__frame_count = int(self.__cap.get(cv2.CAP_PROP_FRAME_COUNT))-1
+        # Load labels
+        label_data = pd.read_hdf(label_file)
+        self.__data_name = label_data.keys()[0][0]
+        self.__label_names = list(dict.fromkeys(k[1] for k in label_data.keys()))  # In column order
+
+        # Use the file's coordinates, with x,y first in the label array
+        file_coords = list(dict.fromkeys(k[2] for k in label_data.keys()))
+        assert 'x' in file_coords and 'y' in file_coords, "Label file has no x,y coordinates: {}".format(label_file)
+        self.__coords = ['x', 'y'] + [c for c in file_coords if c not in ('x', 'y')]
+
+        # Store the labels as one contiguous (frames, labels, coords) array, with the data frame as a view of it
+        columns = pd.MultiIndex.from_product([[self.__data_name], self.__label_names, self.__coords],
+                                             names=label_data.columns.names)
+        assert set(columns) == set(label_data.columns), \
+            "Label file does not have the same coordinates for every label: {}".format(label_file)
+        frame_total = len(label_data.index)
+        self.__label_arrays = np.ascontiguousarray(
+            label_data.reindex(columns=columns).to_numpy().reshape(frame_total, len(self.__label_names), len(self.__coords)))
+        self.__label_data = pd.DataFrame(self.__label_arrays.reshape(frame_total, -1), index=label_data.index,
+                                         columns=columns, copy=False)
+
+        # Rounded pixel coordinates and a mask of labels with both coordinates, for drawing without NaN checks
+        label_xy = self.__label_arrays[:, :, 0:2]
+        self.__xy_valid = ~np.isnan(label_xy).any(axis=2)
+        self.__xy_int = np.round(np.nan_to_num(label_xy, nan=-1)).astype(np.int32)
+        self._render_label_text()
+
+        # Load video, with a second reduced resolution decoder for scrubbing with the frame trackbar
+        self.__video = VideoReader(self.__video_file)
+        self.__draft_video = VideoReader(self.__video_file, lowres=DRAFT_LOWRES)
+        self.__frame_count = self.__video.count_frames()-1
+        frame_bytes = self.__video.width * self.__video.height * 3
+        draft_bytes = self.__draft_video.grab(0).nbytes
+        if draft_bytes >= frame_bytes:
+            # The codec ignores lowres (e.g. H.264), so scrubbing would only decode every frame twice
+            self.__draft_video.close()
+            self.__draft_video = None
+            draft_bytes = 0
+
+        # Cache decoded frames so that revisiting a frame does not decode it again, sharing the memory budget
+        cache_size = max(1, FRAME_CACHE_BYTES // (frame_bytes + draft_bytes))
+        self.__frame_cache = functools.lru_cache(maxsize=cache_size)(self.__video.grab)
+        self.__draft_cache = None
+        if self.__draft_video is not None:
+            self.__draft_cache = functools.lru_cache(maxsize=cache_size)(self.__draft_video.grab)
+        self.__last_decoded_frame_idx = -1
+        self.__last_decoded_frame = None
 
         # Set up track bar
         self.__window_name = self.__label_file
@@ -62,83 +197,225 @@ class Editor(object):
         cv2.createTrackbar('Label', self.__window_name, 0, len(self.__label_names)-1, self._on_label_trackbar)
         cv2.createTrackbar('Frame', self.__window_name, 0, self.__frame_count, self._on_frame_trackbar)
 
+        # Save edits in the background so that disk writes do not block the display
+        self.__save_queue = queue.Queue(maxsize=1)
+        self.__save_thread = threading.Thread(target=self._save_worker, daemon=True)
+        self.__save_thread.start()
+
     def _on_label_trackbar(self, val):
         """Label trackbar value change observer"""
         # Update the label
         self.__current_label = val
-        self.__cap.set(1, self.__current_frame)
-        ret, frame = self.__cap.read()
+        self._render_label_text()
+        self.__dirty = True
 
-        # Get the current label's position
-        x, y = self._get_label_xy()
+    def _read_frame(self, idx):
+        """Get a copy of the decoded frame at the given index that is safe to draw on"""
+        # Label changes and mouse edits redraw the same frame, so skip the cache lookup
+        if idx != self.__last_decoded_frame_idx:
+            self.__last_decoded_frame = self.__frame_cache(idx)
+            self.__last_decoded_frame_idx = idx
 
-        # Display
-        self._draw_label(frame, x, y)
+        return self.__last_decoded_frame.copy()
+
+    def _read_draft_frame(self, idx):
+        """Get a reduced resolution decode of the frame at the given index, scaled to the full frame size"""
+        if idx == self.__last_decoded_frame_idx:
+            return self.__last_decoded_frame.copy()
+
+        # Resizing also makes the copy that is drawn on
+        frame = self.__draft_cache(idx)
+        return cv2.resize(frame, (self.__video.width, self.__video.height), interpolation=cv2.INTER_NEAREST)
 
     def _get_label_xy(self):
-        """Get the current label's coordinates"""
-        x_f = self.__label_data[(self.__data_name, self.__label_names[self.__current_label], 'x')][self.__current_frame]
-        y_f = self.__label_data[(self.__data_name, self.__label_names[self.__current_label], 'y')][self.__current_frame]
-        x_i = int(round(x_f)) if not np.isnan(x_f) else np.nan
-        y_i = int(round(y_f)) if not np.isnan(x_f) else np.nan
-        return x_i, y_i
-
-    def _display_label(self, x, y):
+        """Get the current label's pixel coordinates and whether it has any"""
+        x_i, y_i = self.__xy_int[self.__current_frame, self.__current_label].tolist()
+        return x_i, y_i, self.__xy_valid[self.__current_frame, self.__current_label]
+
+    def _refresh_display(self):
         """Show the current frame and corresponding label coordinates"""
         # Read the frame
-        self.__cap.set(1, self.__current_frame)
-        _ret, _frame = self.__cap.read()
+        if self.__show_draft:
+            _frame = self._read_draft_frame(self.__current_frame)
+        else:
+            _frame = self._read_frame(self.__current_frame)
+
+        # Get the current label's position
+        _x, _y, _valid = self._get_label_xy()
 
         # Display
-        self._draw_label(_frame, x, y)
+        self._draw_label(_frame, _x, _y, _valid)
+        self.__dirty = False
 
-    def _save_label(self, x, y):
-        """Save the label's updated coordinates"""
-        # Update the data frame
-        self.__label_data[(self.__data_name, self.__label_names[self.__current_label], 'x')][self.__current_frame] = x
-        self.__label_data[(self.__data_name, self.__label_names[self.__current_label], 'y')][self.__current_frame] = y
+    def _update_label_in_memory(self, frame, label, x, y):
+        """Update the label's coordinates in the data frame without writing to disk"""
+        with self.__save_lock:
+            self.__label_arrays[frame, label, 0:2] = x, y
+            self.__xy_int[frame, label] = x, y
+            self.__xy_valid[frame, label] = True
+            self.__dirty_cells.add((frame, label))
 
-        # Save the updated *.H5 file
-        self.__label_data.to_hdf(self.__fixed_label_file, key='df', mode='w')
         self.__changes_made = True
 
+    def _apply_pending_edits(self):
+        """Apply the label positions recorded by the mouse observer"""
+        while self.__pending_edits:
+            self._update_label_in_memory(*self.__pending_edits.popleft())
+            self.__dirty = True
+
+        # Save once the button is released
+        if self.__flush_requested:
+            self.__flush_requested = False
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Ask the save worker to write the pending edits to disk"""
+        if not self.__dirty_cells:
+            return
+
+        try:
+            self.__save_queue.put_nowait(True)
+        except queue.Full:
+            pass  # A save is already pending and writes the latest edits
+
+    def _save_worker(self):
+        """Background thread that writes pending edits to disk"""
+        while self.__save_queue.get():
+            # Let further edits accumulate so they are written together
+            time.sleep(self.__save_delay)
+            self._try_flush_to_disk()
+
+    def _stop_save_worker(self):
+        """Stop the save worker after it finishes any pending save"""
+        if self.__save_thread.is_alive():
+            self.__save_queue.put(None)
+            self.__save_thread.join()
+
+    def _try_flush_to_disk(self):
+        """Save the updated *.H5 file, logging failures so that the edits can be saved later"""
+        try:
+            self._flush_to_disk()
+            return True
+        except Exception:
+            logging.exception(f"Failed to save the *.H5 label file: {self.__fixed_label_file}")
+            return False
+
+    def _flush_to_disk(self):
+        """Save the updated *.H5 file if there are unsaved changes"""
+        with self.__file_lock:
+            # Take the pending edits so that editing can continue during the write
+            with self.__save_lock:
+                if not self.__dirty_cells:
+                    return
+
+                dirty_cells, self.__dirty_cells = self.__dirty_cells, set()
+                if self.__h5_columns is None:
+                    label_data = self.__label_data.copy()
+                else:
+                    edits = [(frame, label, *self.__label_arrays[frame, label, 0:2]) for frame, label in dirty_cells]
+
+            try:
+                if self.__h5_columns is None:
+                    # Write the full *.H5 file once as an uncompressed, chunked table, then update it in place
+                    with pd.HDFStore(self.__fixed_label_file, mode='w', complevel=0) as store:
+                        store.put('df', label_data, format='table')
+                    self.__h5_columns = self._get_fixed_label_columns()
+                else:
+                    # Group the edits by frame so each edited row (and the chunk holding it) is written once
+                    row_edits = {}
+                    for frame, label, x, y in edits:
+                        row_edits.setdefault(frame, []).append((label, x, y))
+
+                    # Open the file only for the write so that other programs can read it during the session
+                    with h5py.File(self.__fixed_label_file, 'r+') as h5_file:
+                        table = h5_file['df']['table']
+                        for frame, label_edits in row_edits.items():
+                            row = table[frame:frame + 1]
+                            for label, x, y in label_edits:
+                                x_col, y_col = self.__h5_columns[self.__label_names[label]]
+                                row['values_block_0'][0, x_col] = x
+                                row['values_block_0'][0, y_col] = y
+                            table[frame:frame + 1] = row
+            except Exception:
+                # Keep the edits pending so that the next save writes them
+                with self.__save_lock:
+                    self.__dirty_cells |= dirty_cells
+                raise
+
+    def _get_fixed_label_columns(self):
+        """Get the label coordinate columns for in-place updates of the fixed label file"""
+        # In-place updates require all label values to be stored as a single block
+        with h5py.File(self.__fixed_label_file, 'r') as h5_file:
+            if 'values_block_1' in h5_file['df']['table'].dtype.names:
+                return None
+
+        columns = self.__label_data.columns
+        return {
+            label: (columns.get_loc((self.__data_name, label, 'x')), columns.get_loc((self.__data_name, label, 'y')))
+            for label in self.__label_names
+        }
+
     def _on_frame_trackbar(self, val):
         """Frame trackbar value change observer"""
-        # Update the frame index
-        self.__current_frame = val
-        self.__cap.set(1, self.__current_frame)
-        _ret, _frame = self.__cap.read()
+        # Already displayed (e.g. the trackbar was moved by a key event)
+        if val == self.__current_frame:
+            return
 
-        # Get the current label's position
-        _x, _y = self._get_label_xy()
-
-        # Display
-        self._draw_label(_frame, _x, _y)
+        # Save any edits made on the previous frame
+        self._schedule_flush()
 
-    def _draw_label(self, frame, x, y):
+        # Update the frame index, drawing a reduced resolution frame (if available) until scrubbing stops
+        self.__current_frame = val
+        self.__show_draft = self.__draft_cache is not None
+        self.__last_scrub_time = time.monotonic()
+        self.__dirty = True
+
+    def _render_label_text(self):
+        """Render the current label's name once so that it can be copied onto each frame"""
+        text = self.__label_names[self.__current_label]
+        font, scale, thickness = cv2.FONT_HERSHEY_SIMPLEX, 1, 2
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+
+        # Draw the text on a transparent BGRA canvas with room for the stroke and descenders
+        pad = thickness
+        overlay = np.zeros((h + baseline + 2*pad, w + 2*pad, 4), np.uint8)
+        cv2.putText(overlay, text, (pad, h + pad), font, scale, (*self.__marker_color, 255), thickness)
+
+        # Keep the color premultiplied by alpha (as drawn) and the inverse alpha for blending
+        self.__text_overlay = np.ascontiguousarray(overlay[:, :, :3])
+        self.__text_inv_alpha = cv2.merge([255 - overlay[:, :, 3]] * 3)
+        self.__text_pos = (30 - pad, 30 - h - pad)  # Top-left corner so the text baseline starts at (30, 30)
+
+    def _draw_label(self, frame, x, y, valid):
         """Draw the label coordinates"""
         # Display
-        if all(not np.isnan(v) for v in [x, y]):
+        if valid:
             frame = cv2.drawMarker(frame, (x, y), self.__marker_color, cv2.MARKER_CROSS, self.__marker_size, self.__marker_thickness)
-            frame = cv2.putText(frame, self.__label_names[self.__current_label], (30, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, self.__marker_color, 2)
+
+            # Blend the pre-rendered label name onto the frame
+            tx, ty = self.__text_pos
+            roi = frame[ty:ty + self.__text_overlay.shape[0], tx:tx + self.__text_overlay.shape[1]]
+            h, w = roi.shape[:2]
+            roi[:] = cv2.add(cv2.multiply(roi, self.__text_inv_alpha[:h, :w], scale=1/255), self.__text_overlay[:h, :w])
 
         cv2.imshow(self.__window_name, frame)
 
     def _edit_label(self, event, ex, ey, flags, param):
         """Mouse event observer for editing label positions"""
+        # Only record the edits here, they are applied and drawn by the main loop
         if event == cv2.EVENT_LBUTTONDOWN:
             self.__mx, self.__my = ex, ey
-            self._save_label(self.__mx, self.__my)
-            self._display_label(self.__mx, self.__my)
+            self.__pending_edits.append((self.__current_frame, self.__current_label, ex, ey))
             self.__mouse_pressed = True
 
         elif event == cv2.EVENT_LBUTTONUP:
             self.__mouse_pressed = False
+            self.__flush_requested = True
 
         elif event == cv2.EVENT_MOUSEMOVE:
             if self.__mouse_pressed:
                 self.__mx, self.__my = ex, ey
-                self._display_label(self.__mx, self.__my)
+                self.__pending_edits.append((self.__current_frame, self.__current_label, ex, ey))
 
     def _save_matlab_file(self):
         """Convert the fixed label file to MATLAB (*.MAT) file format"""
@@ -149,61 +426,77 @@ class Editor(object):
         output_filepath = os.path.normpath(os.path.join(folder, output_filename))
 
         # Set up the output structure with X,Y and likelihood data
-        df_out = {}
-        for label in self.__label_names:
-            x_ser = self.__label_data[(self.__data_name, label, 'x')]
-            x_arr = x_ser.to_numpy()
-            y_ser = self.__label_data[(self.__data_name, label, 'y')]
-            y_arr = y_ser.to_numpy()
-            ll_ser = self.__label_data[(self.__data_name, label, 'likelihood')]
-            ll_arr = ll_ser.to_numpy()
-            df_out[label] = {
-                'x': x_arr,
-                'y': y_arr,
-                'likelihood': ll_arr
-            }
+        labels = self.__label_names
+        coords = self.__coords
+        label_arr = self.__label_arrays
+
+        # Copy the strided label columns into contiguous arrays
+        df_out = {label: {coord: np.ascontiguousarray(label_arr[:, i, k]) for k, coord in enumerate(coords)}
+                  for i, label in enumerate(labels)}
 
         # Save *.MAT
         scipy.io.savemat(output_filepath, df_out)
         return output_filepath
 
+    def _step_frame(self, step):
+        """Move to a neighboring frame with the keyboard"""
+        frame = min(max(0, self.__current_frame+step), self.__frame_count)
+        if frame == self.__current_frame:
+            return
+
+        self.__current_frame = frame
+        self.__show_draft = False
+
+        # Place the current label at the mouse position while the button is held
+        if self.__mouse_pressed:
+            self._update_label_in_memory(self.__current_frame, self.__current_label, self.__mx, self.__my)
+
+        self._schedule_flush()
+        cv2.setTrackbarPos('Frame', self.__window_name, self.__current_frame)
+        self.__dirty = True
+
     def run(self):
         """Run the editor"""
         # Begin editing
         running = True
         while running:
-            # Read the frame
-            self.__cap.set(1, self.__current_frame)
-            ret, frame = self.__cap.read()
-
-            # Update the trackbar position
-            cv2.setTrackbarPos('Frame', self.__window_name, self.__current_frame)
-
-            # Display
-            if self.__mouse_pressed:
-                # Update the current label's position
-                x, y = self.__mx, self.__my
-                self._save_label(x, y)
-            else:
-                # Get the current label's position
-                x, y = self._get_label_xy()
-
-            self._draw_label(frame, x, y)
+            # Process window events, then apply the edits recorded by the mouse observer
+            key = poll_key()
+            self._apply_pending_edits()
 
             # Key event
-            key = cv2.waitKey(0)
             if key == 44:
-                self.__current_frame = max(0, self.__current_frame-1)  # Left
+                self._step_frame(-1)  # Left
             elif key == 46:
-                self.__current_frame = min(self.__frame_count, self.__current_frame+1)  # Right
+                self._step_frame(1)  # Right
             elif key == 27:
                 running = False
 
-        self.__cap.release()  # Release the video capture object
+            # Display
+            if self.__dirty:
+                self._refresh_display()
+            elif self.__show_draft and time.monotonic() - self.__last_scrub_time > DRAFT_SETTLE_TIME:
+                self.__show_draft = False
+                self._refresh_display()
+            else:
+                time.sleep(IDLE_SLEEP)
+
+        # Write any pending edits before exiting
+        self._stop_save_worker()
+        h5_saved = self._try_flush_to_disk()
+
+        self.__video.close()  # Release the video file
+        if self.__draft_video is not None:
+            self.__draft_video.close()
+        self.__frame_cache.cache_clear()
+        if self.__draft_cache is not None:
+            self.__draft_cache.cache_clear()
+        self.__last_decoded_frame = None
         cv2.destroyAllWindows()  # Close the editor
 
         if self.__changes_made:
-            logging.info(f"Saved  edited *.H5 label file: {self.__fixed_label_file}")
+            if h5_saved:
+                logging.info(f"Saved  edited *.H5 label file: {self.__fixed_label_file}")
 
             # Save in MATLAB file format
             output_filepath = self._save_matlab_file()
@@ -242,15 +535,11 @@ def read_cli_parameters():
     assert os.path.isfile(video_file), "Video file does not exist: {}".format(video_file)
     assert os.path.splitext(label_file)[-1].lower() == '.h5', "Label file is not *.H5: {}".format(label_file)
     video_ext = os.path.splitext(video_file)[-1].lower()
-    assert (video_ext == '.avi' or video_ext == '.mp4'), "Video file is not *.AVI or *.MP4: {}".format(video_file)
-    assert (marker_color in ['red', 'green', 'blue']), "Color is not red, green or blue: {}".format(marker_color)
+    assert video_ext in _VIDEO_EXTS, "Video file is not *.AVI or *.MP4: {}".format(video_file)
+    assert marker_color in _MARKER_COLORS, "Color is not red, green or blue: {}".format(marker_color)
 
     # Get color RGB
-    marker_color_rgb = {
-        'red': [0, 0, 255],
-        'green': [0, 255, 0],
-        'blue': [255, 0, 0]
-    }[marker_color]
+    marker_color_rgb = _MARKER_COLORS[marker_color]
 
     logging.info(f"Label file is: {label_file}")
     logging.info(f"Video file is: {video_file}")
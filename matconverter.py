@@ -31,7 +31,10 @@ class MatConverter(object):
         # Load labels
         self.__label_data = pd.read_hdf(label_file)
         self.__data_name = self.__label_data.keys()[0][0]
-        self.__label_names = np.unique([k[1] for k in self.__label_data.keys()])
+        self.__label_names = list(dict.fromkeys(k[1] for k in self.__label_data.keys()))  # In column order
+        self.__coords = list(dict.fromkeys(k[2] for k in self.__label_data.keys()))
+        assert len(self.__label_names) * len(self.__coords) == len(self.__label_data.columns), \
+            "Label file does not have the same coordinates for every label: {}".format(label_file)
 
     def _save_matlab_file(self):
         """Convert the fixed label file to MATLAB (*.MAT) file format"""
@@ -42,19 +45,14 @@ class MatConverter(object):
         output_filepath = os.path.normpath(os.path.join(folder, output_filename))
 
         # Set up the output structure with X,Y and likelihood data
-        df_out = {}
-        for label in self.__label_names:
-            x_ser = self.__label_data[(self.__data_name, label, 'x')]
-            x_arr = x_ser.to_numpy()
-            y_ser = self.__label_data[(self.__data_name, label, 'y')]
-            y_arr = y_ser.to_numpy()
-            ll_ser = self.__label_data[(self.__data_name, label, 'likelihood')]
-            ll_arr = ll_ser.to_numpy()
-            df_out[label] = {
-                'x': x_arr,
-                'y': y_arr,
-                'likelihood': ll_arr
-            }
+        labels = self.__label_names
+        coords = self.__coords
+        columns = pd.MultiIndex.from_product([[self.__data_name], labels, coords])
+        label_arr = self.__label_data.reindex(columns=columns).to_numpy().reshape(-1, len(labels), len(coords))
+
+        # Copy the strided label columns into contiguous arrays
+        df_out = {label: {coord: np.ascontiguousarray(label_arr[:, i, k]) for k, coord in enumerate(coords)}
+                  for i, label in enumerate(labels)}
 
         # Save *.MAT
         scipy.io.savemat(output_filepath, df_out)